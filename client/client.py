@@ -142,6 +142,8 @@ def book_management_menu():
                     if "404" in error_msg:
                         print("Error: Book not found!")
                         print("Please check if the Book ID exists.")
+                    elif "409" in error_msg:
+                        print("Error: A book with this ISBN already exists!")
                     else:
                         print("Error: Failed to update book.")
                         print(f"Details: {error_msg}")
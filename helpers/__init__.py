@@ -1,3 +1,3 @@
 from .paths import BOOKS_FILE, USERS_FILE, BORROWS_FILE
 from .read_db import load_books, load_users, load_borrows
-from .write_db import write_records
\ No newline at end of file
+from .write_db import book_rows, user_rows, borrow_rows, write_records, write_records_async, record_writer
\ No newline at end of file
@@ -1,3 +1,4 @@
+from datetime import date
 from .paths import BOOKS_FILE, USERS_FILE, BORROWS_FILE
 
 def _read_lines(path: str):
@@ -52,9 +53,9 @@ def load_borrows():
             "borrow_id": int(parts[0]),
             "user_id": int(parts[1]),
             "book_id": int(parts[2]),
-            "borrow_date": parts[3],
-            "due_date": parts[4],
-            "return_date": parts[5] if parts[5] not in (None, "", "None") else None,
+            "borrow_date": date.fromisoformat(parts[3]),
+            "due_date": date.fromisoformat(parts[4]),
+            "return_date": date.fromisoformat(parts[5]) if parts[5] not in (None, "", "None") else None,
             "status": parts[6]
         })
 
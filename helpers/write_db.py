@@ -1,6 +1,111 @@
+import asyncio
+import os
+
+_locks = {}
+
+def book_rows(book_db: dict) -> list[str]:
+    return [
+        f"{bid}|{b['title']}|{b['author']}|{b['isbn']}|{b['published_year']}|{b['available_copies']}"
+        for bid, b in book_db.items()
+    ]
+
+def user_rows(user_db: dict) -> list[str]:
+    return [f"{uid}|{u['username']}|{u['full_name']}|{u['email']}" for uid, u in user_db.items()]
+
+def borrow_rows(borrow_db: dict) -> list[str]:
+    return [
+        f"{bid}|{b['user_id']}|{b['book_id']}|{b['borrow_date']}|{b['due_date']}|{b['return_date'] or ''}|{b['status']}"
+        for bid, b in borrow_db.items()
+    ]
+
 def write_records(path: str, rows: list[str]):
-    with open(path, "w", encoding="utf-8") as file:
-        for row in rows:
-            if not row.endswith("\n"):
-                row += "\n"
-            file.write(row)
+    content = "".join(row if row.endswith("\n") else row + "\n" for row in rows)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+
+def _write_batch(latest: dict[str, list[str]]):
+    for path, rows in latest.items():
+        write_records(path, rows)
+
+class RecordWriter:
+    def __init__(self, max_size: int = 64, max_delay: float = 0.05):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._queue = None
+        self._task = None
+
+    async def write(self, path: str, rows: list[str]):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((path, rows, future))
+        await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_size and loop.time() < deadline:
+                # Yield so writers scheduled in the same step (e.g. one request's gathered files) can enqueue.
+                await asyncio.sleep(0)
+                if self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        # Every row list is a full snapshot of its file, so only the newest per path needs writing.
+        latest = {}
+        for path, rows, _ in batch:
+            latest[path] = rows
+
+        try:
+            await asyncio.to_thread(_write_batch, latest)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+record_writer = RecordWriter()
+
+async def write_records_async(path: str, rows: list[str]):
+    if record_writer.running:
+        await record_writer.write(path, rows)
+        return
+
+    lock = _locks.setdefault(path, asyncio.Lock())
+    async with lock:
+        await asyncio.to_thread(write_records, path, rows)
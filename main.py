@@ -1,7 +1,43 @@
+import atexit
+import copy
+import logging
+import logging.config
+import os
 import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+def configure_queue_logging():
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["handlers"]["queue"] = {
+        "class": "logging.handlers.QueueHandler",
+        "handlers": ["default"],
+    }
+    config["loggers"]["uvicorn"]["handlers"] = ["queue"]
+    logging.config.dictConfig(config)
+
+    listener = logging.getLogger("uvicorn").handlers[0].listener
+    listener.start()
+    atexit.register(listener.stop)
 
 def main():
-    uvicorn.run("server.app:app", host="127.0.0.1", port=8000, reload=True)
+    dev = os.getenv("DEV") == "1"
+    if not dev:
+        configure_queue_logging()
+
+    uvicorn.run(
+        "server.app:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=1,
+        loop="auto",
+        http="auto",
+        reload=dev,
+        log_level="info" if dev else "warning",
+        log_config=LOGGING_CONFIG if dev else None,
+        access_log=dev,
+        server_header=False,
+        date_header=False,
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,69 +1,49 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
-from helpers.read_db import load_books, load_users, load_borrows
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from collections import Counter
+from datetime import date
 from typing import Optional
+from .cache import cached
+from .storage import book_table, user_table, borrow_table, borrow_view
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 def get_all_books_data():
-    books = load_books()
-    return books
+    return book_table().records
 
 def get_all_users_data():
-    users = load_users()
-    return users
-
-def get_all_borrows_data():
-    borrows = load_borrows()
-    return borrows
+    return user_table().records
 
 def get_overdue_books():
-    borrows = load_borrows()
-    books = load_books()
-    users = load_users()
-    
-    books_dict = {book["id"]: book for book in books}
-    users_dict = {user["id"]: user for user in users}
+    view = borrow_view()
     
     overdue_list = []
-    today = datetime.now().date()
+    today = date.today()
     
-    for borrow in borrows:
-        if borrow["status"] == "borrowed":
-            due_date = datetime.strptime(borrow["due_date"], "%Y-%m-%d").date()
-            if due_date < today:
-                days_overdue = (today - due_date).days
-                book = books_dict.get(borrow["book_id"], {})
-                user = users_dict.get(borrow["user_id"], {})
-                
-                overdue_list.append({
-                    "borrow_id": borrow["borrow_id"],
-                    "user_id": borrow["user_id"],
-                    "username": user.get("username", "Unknown"),
-                    "book_id": borrow["book_id"],
-                    "book_title": book.get("title", "Unknown"),
-                    "borrow_date": borrow["borrow_date"],
-                    "due_date": borrow["due_date"],
-                    "days_overdue": days_overdue
-                })
+    overdue_indices, _, _ = view.table.scan(today.toordinal())
+    for i in overdue_indices:
+        row = view.rows[i]
+        overdue_list.append({
+            "borrow_id": row["borrow_id"],
+            "user_id": row["user_id"],
+            "username": row["username"],
+            "book_id": row["book_id"],
+            "book_title": row["book_title"],
+            "borrow_date": row["borrow_date"],
+            "due_date": row["due_date"],
+            "days_overdue": (today - row["due_date"]).days
+        })
     
     return overdue_list
 
 def get_most_borrowed_books():
-    borrows = load_borrows()
-    books = load_books()
-    
-    books_dict = {book["id"]: book for book in books}
+    books_dict = book_table().by_id
     
-    borrow_count = {}
-    for borrow in borrows:
-        book_id = borrow["book_id"]
-        borrow_count[book_id] = borrow_count.get(book_id, 0) + 1
-    
-    sorted_books = sorted(borrow_count.items(), key=lambda x: x[1], reverse=True)
+    borrow_count = Counter(borrow_table().book_ids.tolist())
     
     result = []
-    for book_id, count in sorted_books[:10]: 
+    for book_id, count in borrow_count.most_common(10): 
         book = books_dict.get(book_id, {})
         result.append({
             "book_id": book_id,
@@ -75,46 +55,26 @@ def get_most_borrowed_books():
     return result
 
 def get_borrowing_history(user_id: Optional[int] = None):
-    borrows = load_borrows()
-    books = load_books()
-    users = load_users()
-    
-    books_dict = {book["id"]: book for book in books}
-    users_dict = {user["id"]: user for user in users}
+    view = borrow_view()
     
-    history = []
-    for borrow in borrows:
-        if user_id is None or borrow["user_id"] == user_id:
-            book = books_dict.get(borrow["book_id"], {})
-            user = users_dict.get(borrow["user_id"], {})
-            
-            history.append({
-                "borrow_id": borrow["borrow_id"],
-                "user_id": borrow["user_id"],
-                "username": user.get("username", "Unknown"),
-                "book_id": borrow["book_id"],
-                "book_title": book.get("title", "Unknown"),
-                "borrow_date": borrow["borrow_date"],
-                "due_date": borrow["due_date"],
-                "return_date": borrow.get("return_date"),
-                "status": borrow["status"]
-            })
-    
-    return history
+    if user_id is None:
+        return view.rows
+    return [view.rows[i] for i in view.table.user_indices(user_id)]
 
-@app.get("/reports", response_model=dict, status_code=200)
+@app.get("/reports", status_code=200)
+@cached
 async def get_all_reports():
     """Get comprehensive admin report with all system data"""
     try:
-        books_data = get_all_books_data()
-        users_data = get_all_users_data()
-        borrows_list = get_all_borrows_data()
+        books_data = await asyncio.to_thread(get_all_books_data)
+        users_data = await asyncio.to_thread(get_all_users_data)
+        borrows = await asyncio.to_thread(borrow_table)
+        borrows_list = borrows.records
         
-        active_borrows = sum(1 for b in borrows_list if b['status'] == 'borrowed')
-        returned_borrows = sum(1 for b in borrows_list if b['status'] == 'returned')
+        _, active_borrows, returned_borrows = borrows.scan(date.today().toordinal())
         total_copies = sum(book["available_copies"] for book in books_data)
         
-        return {
+        return ORJSONResponse(content={
             "summary": {
                 "total_books": len(books_data),
                 "total_users": len(users_data),
@@ -126,27 +86,30 @@ async def get_all_reports():
             "books": books_data,
             "users": users_data,
             "borrows": borrows_list
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
-@app.get("/reports/overdue", response_model=list, status_code=200)
+@app.get("/reports/overdue", status_code=200)
+@cached
 async def get_overdue_report():
     try:
-        return get_overdue_books()
+        return ORJSONResponse(content=await asyncio.to_thread(get_overdue_books))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching overdue books: {str(e)}")
 
-@app.get("/reports/most-borrowed", response_model=list, status_code=200)
+@app.get("/reports/most-borrowed", status_code=200)
+@cached
 async def get_most_borrowed_report():
     try:
-        return get_most_borrowed_books()
+        return ORJSONResponse(content=await asyncio.to_thread(get_most_borrowed_books))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching most borrowed books: {str(e)}")
 
-@app.get("/reports/history", response_model=list, status_code=200)
+@app.get("/reports/history", status_code=200)
+@cached
 async def get_borrowing_history_report(user_id: Optional[int] = None):
     try:
-        return get_borrowing_history(user_id)
+        return ORJSONResponse(content=await asyncio.to_thread(get_borrowing_history, user_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching borrowing history: {str(e)}")
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any
+from urllib.parse import urlsplit
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+MAX_BATCH_SIZE = 20
+
+class SubRequestModel(BaseModel):
+    id: int | str
+    method: str = "GET"
+    url: str
+    body: Any = None
+
+class BatchModel(BaseModel):
+    requests: list[SubRequestModel]
+
+async def dispatch(target, parent_scope: dict, sub: SubRequestModel):
+    url = urlsplit(sub.url)
+    body = b"" if sub.body is None else orjson.dumps(sub.body)
+    scope = {
+        "type": "http",
+        "asgi": parent_scope.get("asgi", {"version": "3.0"}),
+        "http_version": parent_scope.get("http_version", "1.1"),
+        "method": sub.method.upper(),
+        "scheme": parent_scope.get("scheme", "http"),
+        "server": parent_scope.get("server"),
+        "client": parent_scope.get("client"),
+        "root_path": "",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    status = 500
+    location = None
+    chunks = []
+
+    async def send(message):
+        nonlocal status, location
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"location":
+                    location = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await target(scope, receive, send)
+    except Exception:
+        status = 500
+
+    content = b"".join(chunks)
+    try:
+        parsed = orjson.loads(content) if content else None
+    except orjson.JSONDecodeError:
+        parsed = content.decode("utf-8", errors="replace")
+
+    result = {"id": sub.id, "status": status, "body": parsed}
+    if location is not None:
+        result["location"] = location
+    return result
+
+@app.post("/", status_code=200, description="Run several API requests in one round-trip")
+async def run_batch(batch: BatchModel, request: Request):
+    from .app import app as root_app
+
+    if len(batch.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {MAX_BATCH_SIZE} requests")
+    if any(urlsplit(sub.url).path.lstrip("/").startswith("batch") for sub in batch.requests):
+        raise HTTPException(status_code=400, detail="Nested batch requests are not allowed")
+
+    if all(sub.method.upper() == "GET" for sub in batch.requests):
+        responses = await asyncio.gather(*(dispatch(root_app, request.scope, sub) for sub in batch.requests))
+    else:
+        responses = [await dispatch(root_app, request.scope, sub) for sub in batch.requests]
+
+    return ORJSONResponse(content={"responses": list(responses)})
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, Query, Path, HTTPException
-from pydantic import BaseModel
+import itertools
+import orjson
+from fastapi import FastAPI, Query, Path, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
 from helpers.paths import BOOKS_FILE
 from helpers.read_db import load_books
-from helpers.write_db import write_records
+from helpers.write_db import book_rows, write_records_async
+from .cache import invalidate
+from .validation import json_body, parse_body
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 class BookModel(BaseModel):
     title: str | None = None
@@ -13,70 +18,86 @@ class BookModel(BaseModel):
     published_year: int | None = None
     available_copies: int | None = None
 
+BOOK_ADAPTER = TypeAdapter(BookModel)
+
 def load_book_db():
     books = load_books()
     return {book["id"]: book for book in books}
 
 book_db = load_book_db()
+isbn_index = {b["isbn"]: bid for bid, b in book_db.items()}
+next_book_id = itertools.count(max(book_db.keys(), default=0) + 1)
+_books_cache = None
+
+def clear_books_cache():
+    global _books_cache
+    _books_cache = None
 
-@app.get("/", response_model=dict, status_code=200, description="Get all books")
+@app.get("/", status_code=200, description="Get all books")
 async def get_all_books():
-    return book_db
+    global _books_cache
+    if _books_cache is None:
+        _books_cache = orjson.dumps(book_db, option=orjson.OPT_NON_STR_KEYS)
+    return Response(content=_books_cache, media_type="application/json")
 
-@app.post("/", response_model=BookModel, status_code=201, description="Add a new book")
-async def add_book(book: BookModel):
-    for existing in book_db.values():
-        if existing.get("isbn") == book.isbn:
-            raise HTTPException(status_code=409, detail="Conflict")
+@app.post("/", response_model=BookModel, status_code=201, description="Add a new book", openapi_extra=json_body(BookModel))
+async def add_book(request: Request):
+    book = await parse_body(request, BOOK_ADAPTER)
+    if book.isbn in isbn_index:
+        raise HTTPException(status_code=409, detail="Conflict")
 
-    new_id = max(book_db.keys()) + 1 if book_db else 1
-    book_db[new_id] = book.model_dump()
+    new_id = next(next_book_id)
+    book_db[new_id] = {"id": new_id, **book.model_dump()}
+    isbn_index[book.isbn] = new_id
+    clear_books_cache()
 
-    rows = [
-        f"{bid}|{b['title']}|{b['author']}|{b['isbn']}|{b['published_year']}|{b['available_copies']}"
-        for bid, b in book_db.items()
-    ]
-    write_records(BOOKS_FILE, rows)
+    await write_records_async(BOOKS_FILE, book_rows(book_db))
+    await invalidate()
 
     return book_db[new_id]
 
-@app.get("/{book_id}", response_model=BookModel, status_code=200, description="Get a book by ID")
+@app.get("/{book_id}", responses={200: {"model": BookModel}}, status_code=200, description="Get a book by ID")
 async def get_book_by_id(book_id: int = Path(..., description="The ID of the book to retrieve")):
     if book_id not in book_db:
         raise HTTPException(status_code=404, detail="Not Found")
-    return book_db[book_id]
+    return ORJSONResponse(content=book_db[book_id])
 
-@app.put("/{book_id}", response_model=BookModel, status_code=200, description="Update a book by ID")
-async def update_book(book: BookModel, book_id: int = Path(..., description="The ID of the book to update")):
+@app.put("/{book_id}", responses={200: {"model": BookModel}}, status_code=200, description="Update a book by ID", openapi_extra=json_body(BookModel))
+async def update_book(request: Request, book_id: int = Path(..., description="The ID of the book to update")):
+    book = await parse_body(request, BOOK_ADAPTER)
     if book_id not in book_db:
         raise HTTPException(status_code=404, detail="Not Found")
 
     stored = book_db[book_id]
+    if book.isbn and book.isbn != stored["isbn"]:
+        if book.isbn in isbn_index:
+            raise HTTPException(status_code=409, detail="Conflict")
+        if isbn_index.get(stored["isbn"]) == book_id:
+            del isbn_index[stored["isbn"]]
+        isbn_index[book.isbn] = book_id
     stored["title"] = book.title or stored["title"]
     stored["author"] = book.author or stored["author"]
     stored["isbn"] = book.isbn or stored["isbn"]
     stored["published_year"] = book.published_year or stored["published_year"]
     stored["available_copies"] = book.available_copies or stored["available_copies"]
+    clear_books_cache()
 
-    rows = [
-        f"{bid}|{b['title']}|{b['author']}|{b['isbn']}|{b['published_year']}|{b['available_copies']}"
-        for bid, b in book_db.items()
-    ]
-    write_records(BOOKS_FILE, rows)
+    await write_records_async(BOOKS_FILE, book_rows(book_db))
+    await invalidate()
 
-    return stored
+    return ORJSONResponse(content=stored)
 
 @app.delete("/{book_id}", status_code=204, description="Delete a book by ID")
 async def delete_book(book_id: int = Path(..., description="The ID of the book to delete")):
     if book_id not in book_db:
         raise HTTPException(status_code=404, detail="Not Found")
 
-    del book_db[book_id]
+    removed = book_db.pop(book_id)
+    if isbn_index.get(removed["isbn"]) == book_id:
+        del isbn_index[removed["isbn"]]
+    clear_books_cache()
 
-    rows = [
-        f"{bid}|{b['title']}|{b['author']}|{b['isbn']}|{b['published_year']}|{b['available_copies']}"
-        for bid, b in book_db.items()
-    ]
-    write_records(BOOKS_FILE, rows)
+    await write_records_async(BOOKS_FILE, book_rows(book_db))
+    await invalidate()
 
     return None
\ No newline at end of file
@@ -1,48 +1,73 @@
-from fastapi import FastAPI, HTTPException, Path
-from pydantic import BaseModel
-from datetime import datetime, timedelta
+import asyncio
+import itertools
+from fastapi import FastAPI, HTTPException, Path, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from datetime import date, timedelta
 from helpers.read_db import load_books, load_users, load_borrows
-from helpers.write_db import write_records
+from helpers.write_db import book_rows, borrow_rows, write_records_async
 from helpers.paths import BOOKS_FILE, BORROWS_FILE
+from .cache import cached, invalidate
+from .validation import json_body, parse_body
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 class BorrowReturnModel(BaseModel):
     borrow_id: int | None = None
     user_id: int
     book_id: int
-    borrow_date: str | None = None
-    due_date: str | None = None
-    return_date: str | None = None
+    borrow_date: date | None = None
+    due_date: date | None = None
+    return_date: date | None = None
     status: str | None = "borrowed"
 
+BORROW_ADAPTER = TypeAdapter(BorrowReturnModel)
+
 book_db = {book['id']: book for book in load_books()}
 user_db = {user['id']: user for user in load_users()}
 borrow_db = {borrow['borrow_id']: borrow for borrow in load_borrows()}
 
+next_borrow_id = itertools.count(max(borrow_db.keys(), default=0) + 1)
+
+active_borrow_ids = set()
+user_borrow_ids = {}
+book_borrow_ids = {}
+
+def index_borrow(borrow: dict):
+    borrow_id = borrow['borrow_id']
+    user_borrow_ids.setdefault(borrow['user_id'], set()).add(borrow_id)
+    book_borrow_ids.setdefault(borrow['book_id'], set()).add(borrow_id)
+    if borrow['status'] == "borrowed":
+        active_borrow_ids.add(borrow_id)
+
+for borrow in borrow_db.values():
+    index_borrow(borrow)
+
 def get_next_borrow_id():
-    return max(borrow_db.keys(), default=0) + 1
+    return next(next_borrow_id)
+
+def find_borrow_ids(user_id: int, book_id: int):
+    return user_borrow_ids.get(user_id, set()) & book_borrow_ids.get(book_id, set())
+
+def find_active_borrow(user_id: int, book_id: int):
+    active = find_borrow_ids(user_id, book_id) & active_borrow_ids
+    return borrow_db[min(active)] if active else None
 
 def update_book_copies(book_id: int, change: int):
     if book_id not in book_db:
         return False
     book_db[book_id]['available_copies'] += change
-    rows = [
-        f"{b['id']}|{b['title']}|{b['author']}|{b['isbn']}|{b['published_year']}|{b['available_copies']}"
-        for b in book_db.values()
-    ]
-    write_records(BOOKS_FILE, rows)
     return True
 
-def persist_borrows():
-    rows = [
-        f"{b['borrow_id']}|{b['user_id']}|{b['book_id']}|{b['borrow_date']}|{b['due_date']}|{b['return_date'] or ''}|{b['status']}"
-        for b in borrow_db.values()
-    ]
-    write_records(BORROWS_FILE, rows)
+async def persist_books_and_borrows():
+    await asyncio.gather(
+        write_records_async(BOOKS_FILE, book_rows(book_db)),
+        write_records_async(BORROWS_FILE, borrow_rows(borrow_db)),
+    )
 
-@app.post("/", response_model=BorrowReturnModel, status_code=201, description="Borrow a book")
-async def borrow_book(record: BorrowReturnModel):
+@app.post("/", response_model=BorrowReturnModel, status_code=201, description="Borrow a book", openapi_extra=json_body(BorrowReturnModel))
+async def borrow_book(request: Request):
+    record = await parse_body(request, BORROW_ADAPTER)
     if record.user_id not in user_db:
         raise HTTPException(status_code=404, detail="Not Found")
     if record.book_id not in book_db:
@@ -52,13 +77,12 @@ async def borrow_book(record: BorrowReturnModel):
     if book['available_copies'] <= 0:
         raise HTTPException(status_code=400, detail="Bad Request")
     
-    for b in borrow_db.values():
-        if b['user_id'] == record.user_id and b['book_id'] == record.book_id and b['status'] == "borrowed":
-            raise HTTPException(status_code=409, detail="Conflict")
+    if find_active_borrow(record.user_id, record.book_id):
+        raise HTTPException(status_code=409, detail="Conflict")
     
     borrow_id = get_next_borrow_id()
-    borrow_date = datetime.now().strftime("%Y-%m-%d")
-    due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+    borrow_date = date.today()
+    due_date = borrow_date + timedelta(days=7)
     
     borrow_record = {
         "borrow_id": borrow_id,
@@ -71,42 +95,47 @@ async def borrow_book(record: BorrowReturnModel):
     }
     
     borrow_db[borrow_id] = borrow_record
+    index_borrow(borrow_record)
     update_book_copies(record.book_id, -1)
-    persist_borrows()
+    await persist_books_and_borrows()
+    await invalidate()
     
     return BorrowReturnModel(**borrow_record)
 
-@app.post("/return", response_model=BorrowReturnModel, status_code=200, description="Return a book")
-async def return_book(record: BorrowReturnModel):
-    
-    for b in borrow_db.values():
-        if b['user_id'] == record.user_id and b['book_id'] == record.book_id and b['status'] == "borrowed":
-            b['status'] = "returned"
-            b['return_date'] = datetime.now().strftime("%Y-%m-%d")
-            update_book_copies(b['book_id'], 1)
-            persist_borrows()
-            return BorrowReturnModel(**b)
-    
-    raise HTTPException(status_code=404, detail="Not Found")
+@app.post("/return", response_model=BorrowReturnModel, status_code=200, description="Return a book", openapi_extra=json_body(BorrowReturnModel))
+async def return_book(request: Request):
+    record = await parse_body(request, BORROW_ADAPTER)
+    b = find_active_borrow(record.user_id, record.book_id)
+    if b is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    b['status'] = "returned"
+    b['return_date'] = date.today()
+    active_borrow_ids.discard(b['borrow_id'])
+    update_book_copies(b['book_id'], 1)
+    await persist_books_and_borrows()
+    await invalidate()
+    return BorrowReturnModel(**b)
 
-@app.get("/", response_model=list[BorrowReturnModel], status_code=200, description="List all borrow records")
+@app.get("/", status_code=200, description="List all borrow records")
+@cached
 async def list_borrows():
-    return [BorrowReturnModel(**b) for b in borrow_db.values()]
+    return ORJSONResponse(content=list(borrow_db.values()))
 
-@app.get("/user/{user_id}", response_model=list[BorrowReturnModel], status_code=200, description="List borrow records by user")
+@app.get("/user/{user_id}", status_code=200, description="List borrow records by user")
 async def borrows_by_user(user_id: int = Path(..., ge=1)):
-    return [BorrowReturnModel(**b) for b in borrow_db.values() if b['user_id'] == user_id]
+    return ORJSONResponse(content=[borrow_db[i] for i in sorted(user_borrow_ids.get(user_id, ()))])
 
-@app.get("/book/{book_id}", response_model=list[BorrowReturnModel], status_code=200, description="List borrow records by book")
+@app.get("/book/{book_id}", status_code=200, description="List borrow records by book")
 async def borrows_by_book(book_id: int = Path(..., ge=1)):
-    return [BorrowReturnModel(**b) for b in borrow_db.values() if b['book_id'] == book_id]
+    return ORJSONResponse(content=[borrow_db[i] for i in sorted(book_borrow_ids.get(book_id, ()))])
 
-@app.get("/user/{user_id}/book/{book_id}", response_model=BorrowReturnModel, status_code=200, description="Get borrow record by user and book")
+@app.get("/user/{user_id}/book/{book_id}", responses={200: {"model": BorrowReturnModel}}, status_code=200, description="Get borrow record by user and book")
 async def get_borrow_record(user_id: int = Path(..., ge=1), book_id: int = Path(..., ge=1)):
-    for b in borrow_db.values():
-        if b['user_id'] == user_id and b['book_id'] == book_id:
-            return BorrowReturnModel(**b)
-    raise HTTPException(status_code=404, detail="Not Found")
+    borrow_ids = find_borrow_ids(user_id, book_id)
+    if not borrow_ids:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return ORJSONResponse(content=borrow_db[min(borrow_ids)])
 
 @app.get("/check-availability/{book_id}", status_code=200, description="Check if a book is available")
 async def check_book_availability(book_id: int = Path(..., ge=1)):
@@ -1,72 +1,102 @@
-from fastapi import FastAPI, Query, Path, HTTPException
-from pydantic import BaseModel
+import itertools
+import orjson
+from fastapi import FastAPI, Query, Path, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
 from helpers.paths import USERS_FILE
 from helpers.read_db import load_users
-from helpers.write_db import write_records
+from helpers.write_db import user_rows, write_records_async
+from .cache import invalidate
+from .validation import json_body, parse_body
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 class UserModel(BaseModel):
     username: str | None = None
     full_name: str | None = None
     email: str | None = None
 
+USER_ADAPTER = TypeAdapter(UserModel)
+
 def load_user_db():
     users = load_users()
     return {user['id']: user for user in users}
 
 user_db = load_user_db()
+username_index = {u["username"]: uid for uid, u in user_db.items()}
+next_user_id = itertools.count(max(user_db.keys(), default=0) + 1)
+_users_cache = None
 
-@app.get("/", response_model=dict, status_code=200, description="Get all users")
-async def get_all_users():
-    return user_db
+def clear_users_cache():
+    global _users_cache
+    _users_cache = None
 
-@app.post("/", response_model=UserModel, status_code=201, description="Add a new user")
-async def add_user(user: UserModel):
+@app.get("/", status_code=200, description="Get all users")
+async def get_all_users():
+    global _users_cache
+    if _users_cache is None:
+        _users_cache = orjson.dumps(user_db, option=orjson.OPT_NON_STR_KEYS)
+    return Response(content=_users_cache, media_type="application/json")
+
+@app.post("/", response_model=UserModel, status_code=201, description="Add a new user", openapi_extra=json_body(UserModel))
+async def add_user(request: Request):
+    user = await parse_body(request, USER_ADAPTER)
     if not all([user.username, user.full_name, user.email]):
         raise HTTPException(status_code=400, detail="Bad Request")
 
-    for existing in user_db.values():
-        if existing.get("username") == user.username:
-            raise HTTPException(status_code=409, detail="Conflict")
+    if user.username in username_index:
+        raise HTTPException(status_code=409, detail="Conflict")
 
-    new_id = max(user_db.keys()) + 1 if user_db else 1
-    user_db[new_id] = user.model_dump()
+    new_id = next(next_user_id)
+    user_db[new_id] = {"id": new_id, **user.model_dump()}
+    username_index[user.username] = new_id
+    clear_users_cache()
 
-    rows = [f"{uid}|{u['username']}|{u['full_name']}|{u['email']}" for uid, u in user_db.items()]
-    write_records(USERS_FILE, rows)
+    await write_records_async(USERS_FILE, user_rows(user_db))
+    await invalidate()
 
     return user_db[new_id]
 
-@app.get("/{user_id}", response_model=UserModel, status_code=200, description="Get a user by ID")
+@app.get("/{user_id}", responses={200: {"model": UserModel}}, status_code=200, description="Get a user by ID")
 async def get_user_by_id(user_id: int = Path(..., description="The ID of the user to retrieve")):
     if user_id not in user_db:
         raise HTTPException(status_code=404, detail="Not Found")
-    return user_db[user_id]
+    return ORJSONResponse(content=user_db[user_id])
 
-@app.put("/{user_id}", response_model=UserModel, status_code=200, description="Update a user by ID")
-async def update_user(user_id: int, user: UserModel):
+@app.put("/{user_id}", responses={200: {"model": UserModel}}, status_code=200, description="Update a user by ID", openapi_extra=json_body(UserModel))
+async def update_user(user_id: int, request: Request):
+    user = await parse_body(request, USER_ADAPTER)
     if user_id not in user_db:
         raise HTTPException(status_code=404, detail="Not Found")
 
     stored = user_db[user_id]
+    if user.username and user.username != stored["username"]:
+        if user.username in username_index:
+            raise HTTPException(status_code=409, detail="Conflict")
+        if username_index.get(stored["username"]) == user_id:
+            del username_index[stored["username"]]
+        username_index[user.username] = user_id
     stored["username"] = user.username or stored["username"]
     stored["full_name"] = user.full_name or stored["full_name"]
     stored["email"] = user.email or stored["email"]
+    clear_users_cache()
 
-    rows = [f"{uid}|{u['username']}|{u['full_name']}|{u['email']}" for uid, u in user_db.items()]
-    write_records(USERS_FILE, rows)
+    await write_records_async(USERS_FILE, user_rows(user_db))
+    await invalidate()
 
-    return stored
+    return ORJSONResponse(content=stored)
 
 @app.delete("/{user_id}", status_code=204, description="Delete a user by ID")
 async def delete_user(user_id: int):
     if user_id not in user_db:
         raise HTTPException(status_code=404, detail="Not Found")
 
-    del user_db[user_id]
+    removed = user_db.pop(user_id)
+    if username_index.get(removed["username"]) == user_id:
+        del username_index[removed["username"]]
+    clear_users_cache()
 
-    rows = [f"{uid}|{u['username']}|{u['full_name']}|{u['email']}" for uid, u in user_db.items()]
-    write_records(USERS_FILE, rows)
+    await write_records_async(USERS_FILE, user_rows(user_db))
+    await invalidate()
 
     return None
\ No newline at end of file
@@ -1,23 +1,43 @@
+from contextlib import asynccontextmanager
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
+from helpers.write_db import record_writer
 from .api_book_management import app as book_management 
 from .api_user_management import app as user_management 
 from .api_borrow_return import app as borrow_return 
 from .api_admin import app as admin 
+from .api_batch import app as batch
+from . import cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await cache.connect()
+    record_writer.start()
+    yield
+    await record_writer.stop()
+    await cache.disconnect()
 
 app = FastAPI(
     title="Library Management System",
     description="A comprehensive API service for Library Management System with Book Management, User Management, Borrow & Return System and Reports features.",
     version="2.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.mount("/book", book_management)
 app.mount("/user", user_management)
 app.mount("/borrow", borrow_return)
 app.mount("/admin", admin)
+app.mount("/batch", batch)
+
+ROOT_BYTES = orjson.dumps({
+    "title": app.title,
+    "version": app.version,
+    "description": app.description,
+})
 
-@app.get("/", response_model=dict, status_code=200)
+@app.get("/", status_code=200)
 async def root():
-    return {"title": app.title, 
-            "version": app.version, 
-            "description": app.description
-        }
\ No newline at end of file
+    return Response(content=ROOT_BYTES, media_type="application/json")
\ No newline at end of file
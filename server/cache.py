@@ -0,0 +1,62 @@
+import os
+from functools import wraps
+import orjson
+from fastapi import Response
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL = 60
+VERSION_KEY = "lms:version"
+
+redis_client = None
+
+async def connect():
+    global redis_client
+    if REDIS_URL:
+        redis_client = aioredis.from_url(REDIS_URL)
+
+async def disconnect():
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+
+async def invalidate():
+    if redis_client is None:
+        return
+    try:
+        await redis_client.incr(VERSION_KEY)
+    except RedisError:
+        pass
+
+def cached(func):
+    route = f"{func.__module__}.{func.__name__}"
+
+    @wraps(func)
+    async def wrapper(**kwargs):
+        if redis_client is None:
+            return await func(**kwargs)
+
+        key = None
+        try:
+            version = await redis_client.get(VERSION_KEY) or b"0"
+            key = f"lms:{version.decode()}:{route}:{sorted(kwargs.items())}"
+            body = await redis_client.get(key)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
+        except RedisError:
+            pass
+
+        result = await func(**kwargs)
+        body = result.body if isinstance(result, Response) else orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+
+        if key is not None:
+            try:
+                await redis_client.set(key, body, ex=CACHE_TTL)
+            except RedisError:
+                pass
+
+        return Response(content=body, media_type="application/json")
+
+    return wrapper
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+from helpers.paths import BOOKS_FILE, USERS_FILE, BORROWS_FILE
+from helpers.read_db import load_books, load_users, load_borrows
+
+class RecordTable:
+    def __init__(self, records: list[dict], key: str):
+        self.records = records
+        self.by_id = {record[key]: record for record in records}
+
+class BorrowTable:
+    def __init__(self, borrows: list[dict]):
+        self.records = borrows
+        self.user_ids = np.array([b["user_id"] for b in borrows], dtype=np.int64)
+        self.book_ids = np.array([b["book_id"] for b in borrows], dtype=np.int64)
+        self.active = np.array([b["status"] == "borrowed" for b in borrows], dtype=bool)
+        self.returned = np.array([b["status"] == "returned" for b in borrows], dtype=bool)
+        self.due_ordinals = np.array([b["due_date"].toordinal() for b in borrows], dtype=np.int32)
+        self._scan = None
+
+    def overdue_indices(self, today_ordinal: int):
+        return np.flatnonzero(self.active & (self.due_ordinals < today_ordinal)).tolist()
+
+    def scan(self, today_ordinal: int):
+        """Overdue indices, active count and returned count, computed once per day per table"""
+        if self._scan is None or self._scan[0] != today_ordinal:
+            self._scan = (
+                today_ordinal,
+                self.overdue_indices(today_ordinal),
+                int(self.active.sum()),
+                int(self.returned.sum()),
+            )
+        return self._scan[1:]
+
+    def user_indices(self, user_id: int):
+        return np.flatnonzero(self.user_ids == user_id).tolist()
+
+class BorrowView:
+    def __init__(self, table: BorrowTable, rows: list[dict]):
+        self.table = table
+        self.rows = rows
+
+_tables = {}
+
+def _file_version(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _load_table(name: str, paths: tuple[str, ...], build):
+    version = tuple(_file_version(path) for path in paths)
+    cached = _tables.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        _tables[name] = cached
+    return cached[1]
+
+def book_table() -> RecordTable:
+    return _load_table("books", (BOOKS_FILE,), lambda: RecordTable(load_books(), "id"))
+
+def user_table() -> RecordTable:
+    return _load_table("users", (USERS_FILE,), lambda: RecordTable(load_users(), "id"))
+
+def borrow_table() -> BorrowTable:
+    return _load_table("borrows", (BORROWS_FILE,), lambda: BorrowTable(load_borrows()))
+
+def _build_borrow_view():
+    books_dict = book_table().by_id
+    users_dict = user_table().by_id
+    table = borrow_table()
+    rows = []
+
+    for borrow in table.records:
+        book = books_dict.get(borrow["book_id"], {})
+        user = users_dict.get(borrow["user_id"], {})
+        rows.append({
+            "borrow_id": borrow["borrow_id"],
+            "user_id": borrow["user_id"],
+            "username": user.get("username", "Unknown"),
+            "book_id": borrow["book_id"],
+            "book_title": book.get("title", "Unknown"),
+            "borrow_date": borrow["borrow_date"],
+            "due_date": borrow["due_date"],
+            "return_date": borrow.get("return_date"),
+            "status": borrow["status"]
+        })
+
+    return BorrowView(table, rows)
+
+def borrow_view() -> BorrowView:
+    """Borrow records joined with username and book title, row-aligned with view.table"""
+    return _load_table("borrow_view", (BOOKS_FILE, USERS_FILE, BORROWS_FILE), _build_borrow_view)
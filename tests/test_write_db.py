@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import helpers.write_db as write_db
+from helpers.write_db import RecordWriter
+
+try:
+    import server.api_borrow_return as api_borrow_return
+except ImportError:
+    api_borrow_return = None
+
+class RecordWriterTest(unittest.IsolatedAsyncioTestCase):
+    max_delay = 0.2
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "records.txt")
+        self.other_path = os.path.join(self.tmp_dir.name, "other.txt")
+        self.writer = RecordWriter(max_delay=self.max_delay)
+        self.writer.start()
+        self.flushes = []
+        write_batch = write_db._write_batch
+        def counting_write_batch(latest):
+            self.flushes.append(sorted(latest))
+            write_batch(latest)
+        patcher = mock.patch.object(write_db, "_write_batch", counting_write_batch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.writer.stop()
+        self.tmp_dir.cleanup()
+
+    def read(self, path=None):
+        with open(path or self.path, encoding="utf-8") as file:
+            return file.read()
+
+    async def test_coalesces_snapshots_per_path(self):
+        await asyncio.gather(*(self.writer.write(self.path, [str(i)]) for i in range(5)))
+        self.assertEqual(self.read(), "4\n")
+        self.assertEqual(len(self.flushes), 1)
+
+    async def test_single_write_does_not_wait_for_max_delay(self):
+        start = time.perf_counter()
+        await self.writer.write(self.path, ["only"])
+        self.assertLess(time.perf_counter() - start, self.max_delay / 2)
+        self.assertEqual(self.read(), "only\n")
+
+    async def test_gathered_writes_share_one_flush(self):
+        start = time.perf_counter()
+        await asyncio.gather(
+            self.writer.write(self.path, ["books"]),
+            self.writer.write(self.other_path, ["borrows"]),
+        )
+        self.assertLess(time.perf_counter() - start, self.max_delay / 2)
+        self.assertEqual(self.flushes, [sorted([self.path, self.other_path])])
+
+    async def test_cancelled_write_does_not_stop_writer(self):
+        cancelled = asyncio.create_task(self.writer.write(self.path, ["first"]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+
+        await asyncio.wait_for(self.writer.write(self.path, ["second"]), timeout=1)
+        self.assertTrue(self.writer.running)
+        self.assertEqual(self.read(), "second\n")
+
+    @unittest.skipIf(api_borrow_return is None, "server dependencies are not installed")
+    async def test_borrow_persists_books_and_borrows_in_one_flush(self):
+        books_file = os.path.join(self.tmp_dir.name, "books.txt")
+        borrows_file = os.path.join(self.tmp_dir.name, "borrows.txt")
+        with mock.patch.object(write_db, "record_writer", self.writer), \
+                mock.patch.object(api_borrow_return, "BOOKS_FILE", books_file), \
+                mock.patch.object(api_borrow_return, "BORROWS_FILE", borrows_file):
+            start = time.perf_counter()
+            await api_borrow_return.persist_books_and_borrows()
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(self.flushes, [sorted([books_file, borrows_file])])
+        self.assertLess(elapsed, self.max_delay / 2)
+
+if __name__ == "__main__":
+    unittest.main()